@@ -1,41 +1,139 @@
 from __future__ import annotations
 
-from typing import Literal
-from PyPDF2 import PdfReader
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Hashable, Literal, Optional, Pattern, Tuple
 
 Bureau = Literal["TRANSUNION", "EXPERIAN", "EQUIFAX", "UNKNOWN"]
 
+# (keyword, bureau) en orden de prioridad; el primer match gana.
+_BUREAU_KEYS: Tuple[Tuple[str, Bureau], ...] = (
+    ("transunion", "TRANSUNION"),
+    ("experian", "EXPERIAN"),
+    ("equifax", "EQUIFAX"),
+    # Algunas variantes comunes en PDFs
+    ("trans union", "TRANSUNION"),
+)
+# Mismas claves en bytes (minúsculas, como el texto): literal `in`, sin regex
+_BUREAU_KEYS_BYTES: Tuple[Tuple[bytes, Bureau], ...] = tuple((k.encode(), b) for k, b in _BUREAU_KEYS)
 
-def _safe_lower(s: str) -> str:
-    return (s or "").lower()
+# Escaneo rápido: bytes crudos del inicio del PDF (metadata / streams sin comprimir)
+QUICK_SCAN_BYTES = 256 * 1024
 
+# Memo LRU de resultados (reintentos / reruns no re-parsean el PDF)
+MEMO_MAX = 128
+_MEMO: "OrderedDict[Hashable, Bureau]" = OrderedDict()
+_MEMO_LOCK = threading.Lock()
 
-def detect_bureau(pdf_path: str, pages_to_scan: int = 2) -> Bureau:
+
+# Texto extraído: patrones compilados una vez (IGNORECASE => sin copia .lower()
+# del texto); mismo orden de prioridad que _BUREAU_KEYS. La variante separada
+# va al final y tolera "Trans\nUnion" / espacios dobles.
+_BUREAU_PATTERNS: Tuple[Tuple[Pattern[str], Bureau], ...] = (
+    (re.compile(r"transunion", re.IGNORECASE), "TRANSUNION"),
+    (re.compile(r"experian", re.IGNORECASE), "EXPERIAN"),
+    (re.compile(r"equifax", re.IGNORECASE), "EQUIFAX"),
+    (re.compile(r"trans\s+union", re.IGNORECASE), "TRANSUNION"),
+)
+
+
+def _match_bureau(t: str) -> Bureau:
+    """Primer patrón (en orden de prioridad) que aparece en el texto."""
+    if t:
+        for patt, b in _BUREAU_PATTERNS:
+            if patt.search(t):
+                return b
+    return "UNKNOWN"
+
+
+def _quick_scan(pdf_path: str) -> Bureau:
+    """Busca los nombres en los primeros QUICK_SCAN_BYTES sin parsear el PDF."""
+    with open(pdf_path, "rb") as f:
+        blob = f.read(QUICK_SCAN_BYTES).lower()
+    for k, b in _BUREAU_KEYS_BYTES:
+        if k in blob:
+            return b
+    return "UNKNOWN"
+
+
+def detect_bureau(pdf_path: str, pages_to_scan: int = 2, content_sha: Optional[str] = None) -> Bureau:
     """
-    Detecta buró leyendo texto de las primeras páginas del PDF.
+    Detecta buró: escaneo rápido de bytes; si no hay match, texto de las
+    primeras páginas del PDF (pypdfium2, o PyPDF2 como respaldo).
+    Memoizado por content_sha (los uploads llegan como temp files con nombre
+    uuid, así que un key por path nunca acierta); sin hash, por (path, size, mtime).
     Fail-closed: si no puede leer, devuelve UNKNOWN.
     """
+    if content_sha:
+        key: Hashable = (content_sha, pages_to_scan)
+    else:
+        try:
+            st = os.stat(pdf_path)
+        except OSError:
+            return "UNKNOWN"
+        key = (pdf_path, st.st_size, st.st_mtime_ns, pages_to_scan)
+
+    with _MEMO_LOCK:
+        hit = _MEMO.get(key)
+        if hit is not None:
+            _MEMO.move_to_end(key)
+            return hit
+
+    bureau = _detect_bureau_uncached(pdf_path, pages_to_scan)
+
+    with _MEMO_LOCK:
+        _MEMO[key] = bureau
+        _MEMO.move_to_end(key)
+        while len(_MEMO) > MEMO_MAX:
+            _MEMO.popitem(last=False)
+    return bureau
+
+
+def _extract_text_pdfium(pdf_path: str, pages_to_scan: int) -> str:
+    import pypdfium2 as pdfium  # PDFium (C): mucho más rápido que PyPDF2
+
+    pdf = pdfium.PdfDocument(pdf_path)
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        for i in range(min(pages_to_scan, len(reader.pages))):
-            page_text = reader.pages[i].extract_text() or ""
-            text += "\n" + page_text
-
-        t = _safe_lower(text)
-
-        # Señales típicas
-        if "transunion" in t:
-            return "TRANSUNION"
-        if "experian" in t:
-            return "EXPERIAN"
-        if "equifax" in t:
-            return "EQUIFAX"
-
-        # Algunas variantes comunes en PDFs
-        if "trans union" in t:
-            return "TRANSUNION"
+        chunks = []
+        for i in range(min(pages_to_scan, len(pdf))):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                chunks.append(textpage.get_text_range())
+            finally:
+                # liberar memoria nativa explícitamente
+                textpage.close()
+                page.close()
+        return "\n".join(chunks)
+    finally:
+        pdf.close()
 
-        return "UNKNOWN"
+
+def _extract_text_pypdf2(pdf_path: str, pages_to_scan: int) -> str:
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return "\n".join(
+        reader.pages[i].extract_text() or "" for i in range(min(pages_to_scan, len(reader.pages)))
+    )
+
+
+def _extract_text(pdf_path: str, pages_to_scan: int) -> str:
+    """pypdfium2 si está disponible; PyPDF2 como respaldo (sin wheels / PDF raro)."""
+    try:
+        return _extract_text_pdfium(pdf_path, pages_to_scan)
+    except Exception:
+        return _extract_text_pypdf2(pdf_path, pages_to_scan)
+
+
+def _detect_bureau_uncached(pdf_path: str, pages_to_scan: int) -> Bureau:
+    try:
+        bureau = _quick_scan(pdf_path)
+        if bureau != "UNKNOWN":
+            return bureau
+
+        return _match_bureau(_extract_text(pdf_path, pages_to_scan))
     except Exception:
         return "UNKNOWN"
@@ -11,24 +11,19 @@ from __future__ import annotations
 import os
 import json
 import time
-import datetime as dt
-from typing import Any, Dict, Optional, Tuple
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
-from google import genai
-from google.genai import types
+import json_compat
+from bureau_detector import detect_bureau
+from kernel_core import KERNEL_VERSION, NOTES_IMMUTABLE, _empty_payload, _finalize_payload, _utc_iso
+from manifest_manager import ManifestManager, _with_retry
 
-from manifest_manager import ManifestManager
-
-# -----------------------------
-# CANON (DO NOT DRIFT)
-# -----------------------------
-KERNEL_VERSION = "NS-DK-1.0"
-NOTES_IMMUTABLE = "TECHNICAL_DATA_CONSISTENCY_CHECK_ONLY"
-
-ALLOWED_STATUS = {"OK", "RISK_DETECTED", "INCOMPLETE", "UNKNOWN", "SCOPE_LIMITATION"}
-ALLOWED_RISK = {"NONE", "LOW", "MEDIUM", "HIGH"}
-
-CONFIDENCE_GATE = 0.70
+if TYPE_CHECKING:
+    from google import genai
 
 # -----------------------------
 # PATHS (Repo-local)
@@ -36,8 +31,15 @@ CONFIDENCE_GATE = 0.70
 SOUL_DIR = "00_NORTHSTAR_SOUL_IMPUT"
 BTM_DIR = os.path.join(SOUL_DIR, "btm")
 MANIFEST_PATH = "manifests/soul_manifest.json"
+REPORT_MANIFEST_PATH = "manifests/report_manifest.json"
 TMP_DIR = "tmp"
 
+# Once per process (not per audit)
+try:
+    os.makedirs(TMP_DIR, exist_ok=True)
+except OSError:
+    pass
+
 # -----------------------------
 # GEMINI
 # -----------------------------
@@ -46,100 +48,6 @@ MODEL_ID = "gemini-2.5-flash"
 GEMINI_API_KEY_ENV = "GEMINI_API_KEY"
 
 
-def _utc_iso() -> str:
-    return dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-
-
-def _empty_payload(
-    status: str = "INCOMPLETE",
-    risk_level: str = "NONE",
-    confidence: float = 0.0,
-    notes_extra: str = "",
-) -> Dict[str, Any]:
-    notes = NOTES_IMMUTABLE if not notes_extra else f"{NOTES_IMMUTABLE} | {notes_extra}"
-    return {
-        "version": KERNEL_VERSION,
-        "timestamp": _utc_iso(),
-        "status": status,
-        "risk_level": risk_level,
-        "findings": [],
-        "confidence": float(confidence),
-        "notes": notes,
-    }
-
-
-def _validate_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """Enforces NS-DK-1.0 contract + fail-closed."""
-    try:
-        payload = dict(payload or {})
-        payload["version"] = KERNEL_VERSION
-        payload["timestamp"] = payload.get("timestamp") or _utc_iso()
-
-        if payload.get("status") not in ALLOWED_STATUS:
-            return _empty_payload(status="UNKNOWN", risk_level="NONE", confidence=0.0, notes_extra="BAD_STATUS")
-
-        if payload.get("risk_level") not in ALLOWED_RISK:
-            return _empty_payload(status="UNKNOWN", risk_level="NONE", confidence=0.0, notes_extra="BAD_RISK_LEVEL")
-
-        if not isinstance(payload.get("findings"), list):
-            payload["findings"] = []
-
-        conf = payload.get("confidence")
-        payload["confidence"] = float(conf) if isinstance(conf, (int, float)) else 0.0
-
-        # Integrity gate
-        if payload["confidence"] < CONFIDENCE_GATE:
-            return _empty_payload(
-                status="UNKNOWN",
-                risk_level="NONE",
-                confidence=payload["confidence"],
-                notes_extra="CONFIDENCE_GATE_ACTIVE",
-            )
-
-        payload["notes"] = NOTES_IMMUTABLE
-        return payload
-
-    except Exception:
-        return _empty_payload(status="UNKNOWN", risk_level="NONE", confidence=0.0, notes_extra="VALIDATION_EXCEPTION")
-
-
-def _evidence_gate(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Keep only findings that have evidence: document + page + field.
-    If status=RISK_DETECTED but no valid findings => UNKNOWN.
-    """
-    findings = payload.get("findings", [])
-    if not isinstance(findings, list):
-        payload["findings"] = []
-        return payload
-
-    valid = []
-    for f in findings:
-        if not isinstance(f, dict):
-            continue
-        ev = f.get("evidence") or {}
-        if not isinstance(ev, dict):
-            continue
-
-        doc = ev.get("document")
-        page = ev.get("page")
-        field = ev.get("field")
-
-        if doc and page and field:
-            # avoid placeholders
-            if str(page).strip().upper() != "UNKNOWN" and str(field).strip().upper() != "UNKNOWN":
-                valid.append(f)
-
-    payload["findings"] = valid
-
-    if payload.get("status") == "RISK_DETECTED" and not valid:
-        payload["status"] = "UNKNOWN"
-        payload["risk_level"] = "NONE"
-        payload["confidence"] = min(float(payload.get("confidence", 0.0) or 0.0), 0.5)
-
-    return payload
-
-
 # -----------------------------
 # API KEY (Streamlit Cloud safe)
 # -----------------------------
@@ -160,43 +68,70 @@ def _get_api_key() -> Optional[str]:
     return None
 
 
+@lru_cache(maxsize=1)
+def _genai():
+    """Lazy SDK import: importing kernel for pure helpers must not load google-genai."""
+    from google import genai
+    from google.genai import types
+    return genai, types
+
+
+@lru_cache(maxsize=1)
 def _client() -> genai.Client:
+    """Process-wide client (reuses its HTTP pool across audits)."""
     api_key = _get_api_key()
     if not api_key:
         raise RuntimeError("Missing GEMINI_API_KEY (env or Streamlit secrets).")
+    genai, _ = _genai()
     return genai.Client(api_key=api_key)
 
 
 # -----------------------------
 # BUREAU DETECTOR (simple + reliable)
 # -----------------------------
+# (keyword, bureau) in priority order; first hit wins.
+_FILENAME_BUREAU_KEYS = (
+    ("experian", "EXPERIAN"),
+    ("equifax", "EQUIFAX"),
+    ("transunion", "TRANSUNION"),
+    ("tu", "TRANSUNION"),
+)
+
+
 def _detect_bureau_from_filename(file_path: str) -> str:
     """Fallback detector if PDF text extraction is not available."""
     name = (os.path.basename(file_path) or "").lower()
-    if "experian" in name:
-        return "EXPERIAN"
-    if "equifax" in name:
-        return "EQUIFAX"
-    if "transunion" in name or "tu" in name:
-        return "TRANSUNION"
+    for k, b in _FILENAME_BUREAU_KEYS:
+        if k in name:
+            return b
     return "UNKNOWN"
 
 
-def _load_btm(bureau: str) -> Optional[Dict[str, Any]]:
+def _btm_path(bureau: str) -> str:
+    return os.path.join(BTM_DIR, f"BTM_{bureau.upper()}.json")
+
+
+def _btm_mtime_ns(bureau: str) -> int:
+    """0 when the BTM file is missing (a later deploy adding it changes the key)."""
+    try:
+        return os.stat(_btm_path(bureau)).st_mtime_ns
+    except OSError:
+        return 0
+
+
+@lru_cache(maxsize=8)
+def _load_btm_cached(bureau: str, mtime_ns: int) -> Optional[Dict[str, Any]]:
     """
     Loads BTM JSON from SOUL/btm.
     Expected file names:
       - BTM_TRANSUNION.json
       - BTM_EXPERIAN.json
       - BTM_EQUIFAX.json
+    Cached per (bureau, mtime): BTMs only change between deployments.
     """
-    fname = f"BTM_{bureau.upper()}.json"
-    path = os.path.join(BTM_DIR, fname)
-    if not os.path.exists(path):
-        return None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(_btm_path(bureau), "rb") as f:
+            return json_compat.loads(f.read())
     except Exception:
         return None
 
@@ -226,6 +161,19 @@ def _btm_summary_for_prompt(btm: Dict[str, Any]) -> str:
     )
 
 
+@lru_cache(maxsize=8)
+def _btm_prompt_texts_cached(bureau: str, mtime_ns: int) -> Tuple[str, ...]:
+    btm = _load_btm_cached(bureau, mtime_ns) if mtime_ns else None
+    if not btm:
+        return (f"BTM_NOT_FOUND for bureau={bureau}. Proceed fail-closed.",)
+    return (
+        _btm_summary_for_prompt(btm),
+        "BTM_JSON_BEGIN",
+        json.dumps(btm, ensure_ascii=False),
+        "BTM_JSON_END",
+    )
+
+
 # -----------------------------
 # SYSTEM INSTRUCTION (V2.1)
 # -----------------------------
@@ -270,139 +218,319 @@ OUTPUT REQUIREMENTS:
 """.strip()
 
 
+@lru_cache(maxsize=1)
+def _generate_config():
+    """
+    SYSTEM_INSTRUCTION is static (BTM goes in the contents, not here), so the
+    config wrapping it is built/validated once per process, not per audit.
+    """
+    _, types = _genai()
+    return types.GenerateContentConfig(
+        system_instruction=SYSTEM_INSTRUCTION,
+        temperature=0.0,
+        response_mime_type="application/json",
+    )
+
+
+@lru_cache(maxsize=1)
+def _manifest_manager() -> ManifestManager:
+    """Process-wide manifest (loaded from disk once, kept in memory)."""
+    return ManifestManager(MANIFEST_PATH, _client())
+
+
+@lru_cache(maxsize=1)
+def _report_manifest() -> ManifestManager:
+    """
+    Separate manifest for report uploads (content-hash index only), so a new
+    report never rewrites the SOUL manifest / invalidates the SOUL cache.
+    """
+    return ManifestManager(REPORT_MANIFEST_PATH, _client())
+
+
+# -----------------------------
+# SOUL PARTS CACHE (process-level)
+# -----------------------------
+# Keyed on (SOUL dir mtime, manifest mtime): adding/removing a SOUL PDF or any
+# manifest rewrite invalidates it. Each entry lives min(SOUL_CACHE_TTL_S, time
+# left before the soonest ref expires): in-place PDF edits keep dir mtime, and
+# Gemini Files are deleted server-side (48h). A failed model call drops it.
+# Holds the ready-made types.Part objects, so warm audits allocate none for SOUL.
+SOUL_CACHE_TTL_S = 6 * 3600
+# value: (monotonic deadline, (parts, SOUL exclusion notes))
+_SOUL_CACHE: Dict[Tuple[int, int], Tuple[float, Tuple[tuple, str]]] = {}
+_SOUL_CACHE_LOCK = threading.Lock()
+
+
+def _soul_cache_key() -> Tuple[int, int]:
+    manifest_mtime = os.stat(MANIFEST_PATH).st_mtime_ns if os.path.exists(MANIFEST_PATH) else 0
+    return (os.stat(SOUL_DIR).st_mtime_ns, manifest_mtime)
+
+
+def _soul_exclusion_notes(oversized: Tuple[str, ...], skipped: Tuple[str, ...]) -> str:
+    """Notes suffix naming every SOUL PDF left out of context ("" if none)."""
+    notes = ""
+    if oversized:
+        notes += f" | SOUL_EXCLUDED_OVERSIZE={','.join(oversized)}"
+    if skipped:
+        notes += f" | SOUL_EXCLUDED_PROCESSING={','.join(skipped)}"
+    return notes
+
+
+def _soul_parts(mm: ManifestManager) -> Tuple[tuple, str]:
+    """
+    SOUL PDF parts for this process; only re-validates when the key or TTL changes.
+    Also returns the notes naming the SOUL PDFs left out, so audits can report them.
+    """
+    with _SOUL_CACHE_LOCK:
+        hit = _SOUL_CACHE.get(_soul_cache_key())
+        if hit and time.monotonic() < hit[0]:
+            return hit[1]
+
+        soul = mm.ensure_active_pdf_files(SOUL_DIR)
+        _, types = _genai()
+        # identical SOUL PDFs share one remote => send each uri once
+        uris = dict.fromkeys(ref["uri"] for ref in soul.refs)
+        parts = tuple(types.Part.from_uri(file_uri=uri, mime_type=PDF_MIME) for uri in uris)
+        result = (parts, _soul_exclusion_notes(soul.oversized, soul.skipped))
+
+        # Key after ensure (it may have rewritten the manifest).
+        # Partial set (some PDFs stuck in PROCESSING) => not cached, next audit retries them.
+        _SOUL_CACHE.clear()
+        ttl = SOUL_CACHE_TTL_S
+        if soul.earliest_expiry:
+            ttl = min(ttl, soul.earliest_expiry - time.time())
+        if not soul.skipped and ttl > 0:
+            _SOUL_CACHE[_soul_cache_key()] = (time.monotonic() + ttl, result)
+        return result
+
+
+def _drop_soul_cache() -> None:
+    """Forget cached SOUL parts (their remote refs may be gone / from another key)."""
+    with _SOUL_CACHE_LOCK:
+        _SOUL_CACHE.clear()
+
+
+def _reset_client() -> None:
+    """
+    Drop the process-wide client + manifests + SOUL parts (tests / API key
+    rotation): cached Part URIs belong to the old key's project.
+    """
+    _client.cache_clear()
+    _manifest_manager.cache_clear()
+    _report_manifest.cache_clear()
+    _drop_soul_cache()
+
+
 # -----------------------------
 # UPLOAD HELPERS (uses ManifestManager for SOUL)
 # -----------------------------
-def _upload_and_wait(client: genai.Client, file_path: str):
-    # IMPORTANT: ManifestManager already uses upload_any for SOUL.
-    # For the report, we do a simple upload but must be SDK-safe.
-    # We'll reuse ManifestManager.upload_any logic by importing it indirectly is messy.
-    # So we do a minimal compatible approach:
-    from manifest_manager import upload_any  # local import to avoid cycles
-    return upload_any(client, file_path)
+def _upload_report(file_path: str, content_sha: Optional[str] = None) -> Dict[str, str]:
+    # ManifestManager uses upload_any (SDK-safe) for SOUL; the report goes through
+    # the same path, deduped by content hash so re-audits skip the upload.
+    # content_sha (hashed by the caller while saving) => no extra read pass.
+    return _report_manifest().ensure_active_file(file_path, sha=content_sha)
+
+
+PROMPT_TEXT = (
+    "Perform a technical consistency audit of the attached credit report against SOUL standards. "
+    "Use BTM as a translation dictionary first if provided. "
+    "Return ONLY NS-DK-1.0 JSON."
+)
+PDF_MIME = "application/pdf"
+
+
+def _btm_parts(bureau: str) -> tuple:
+    """
+    BTM prompt Parts (compact summary + full JSON) for the bureau.
+    Cached per (bureau, BTM mtime) => steady-state audits do no BTM file I/O,
+    no json.dumps and no Part construction.
+    """
+    return _btm_parts_cached(bureau, _btm_mtime_ns(bureau) if bureau != "UNKNOWN" else 0)
+
+
+@lru_cache(maxsize=8)
+def _btm_parts_cached(bureau: str, mtime_ns: int) -> tuple:
+    _, types = _genai()
+    return tuple(types.Part.from_text(text=t) for t in _btm_prompt_texts_cached(bureau, mtime_ns))
+
+
+@lru_cache(maxsize=1)
+def _prompt_part():
+    _, types = _genai()
+    return types.Part.from_text(text=PROMPT_TEXT)
 
 
 def _build_parts_with_soul_and_btm(
-    soul_refs,
+    soul_parts: tuple,
     report_uri: str,
     bureau: str,
-    btm_json: Optional[Dict[str, Any]],
 ) -> list:
-    parts = []
-
-    # 1) SOUL PDFs first
-    for ref in soul_refs:
-        parts.append(types.Part.from_uri(file_uri=ref["uri"], mime_type="application/pdf"))
-
-    # 2) BTM JSON as text (compact + full JSON)
-    if btm_json:
-        parts.append(types.Part.from_text(text=_btm_summary_for_prompt(btm_json)))
-        parts.append(types.Part.from_text(text="BTM_JSON_BEGIN"))
-        parts.append(types.Part.from_text(text=json.dumps(btm_json, ensure_ascii=False)))
-        parts.append(types.Part.from_text(text="BTM_JSON_END"))
-    else:
-        parts.append(types.Part.from_text(text=f"BTM_NOT_FOUND for bureau={bureau}. Proceed fail-closed."))
-
-    # 3) Report PDF last
-    parts.append(types.Part.from_uri(file_uri=report_uri, mime_type="application/pdf"))
-
-    # 4) Task
-    parts.append(
-        types.Part.from_text(
-            text=(
-                "Perform a technical consistency audit of the attached credit report against SOUL standards. "
-                "Use BTM as a translation dictionary first if provided. "
-                "Return ONLY NS-DK-1.0 JSON."
-            )
-        )
-    )
+    _, types = _genai()
 
-    return parts
+    # 1) SOUL PDFs first (cached parts), 2) BTM JSON as text (compact + full JSON),
+    # 3) Report PDF last, 4) Task
+    return [
+        *soul_parts,
+        *_btm_parts(bureau),
+        types.Part.from_uri(file_uri=report_uri, mime_type=PDF_MIME),
+        _prompt_part(),
+    ]
 
 
-def _run_gemini_audit(report_path: str) -> Dict[str, Any]:
-    client = _client()
+# -----------------------------
+# RATE LIMIT (model calls)
+# -----------------------------
+# Client-side pacing for generate_content (free tier: 15 RPM). GEMINI_RPM=0 disables.
+# Files API calls are not paced: they don't count against the model RPM quota.
+GEMINI_RPM_ENV = "GEMINI_RPM"
+DEFAULT_RPM = 15
 
-    # 1) SOUL PDFs (excluding btm folder; only PDFs at SOUL root)
-    if not os.path.isdir(SOUL_DIR):
-        return _empty_payload(status="INCOMPLETE", notes_extra="SOUL_DIR_MISSING")
 
-    mm = ManifestManager(MANIFEST_PATH, client)
+class _RateLimiter:
+    """
+    Sliding 60s window: at most `rpm` calls per minute.
+    acquire() sleeps (outside the lock) until the oldest call leaves the window.
+    """
+
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self._calls: deque = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rpm <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= 60.0:
+                    self._calls.popleft()
+                if len(self._calls) < self.rpm:
+                    self._calls.append(now)
+                    return
+                wait = 60.0 - (now - self._calls[0])
+            time.sleep(wait)
+
+
+def _env_rpm() -> int:
     try:
-        soul_refs = mm.ensure_active_pdf_files(SOUL_DIR)
-    except Exception:
-        return _empty_payload(status="INCOMPLETE", notes_extra="SOUL_MANIFEST_FAIL")
+        return int(os.getenv(GEMINI_RPM_ENV, DEFAULT_RPM))
+    except ValueError:
+        return DEFAULT_RPM
+
 
-    # Safety: if SOUL has no PDFs at root, fail-closed
-    if not soul_refs:
-        return _empty_payload(status="INCOMPLETE", notes_extra="SOUL_NO_PDFS_FOUND")
+# one limiter per process, shared by every audit
+_RATE_LIMITER = _RateLimiter(_env_rpm())
 
-    # 2) Detect bureau + load BTM
-    bureau = _detect_bureau_from_filename(report_path)
-    btm = _load_btm(bureau) if bureau != "UNKNOWN" else None
 
-    # If bureau unknown, still proceed, but with stricter fail-closed
-    if bureau == "UNKNOWN":
-        btm = None
+def _run_gemini_audit(report_path: str, ts: str, content_sha: Optional[str] = None) -> Dict[str, Any]:
+    client = _client()
+    _, types = _genai()
+
+    # 1) SOUL PDFs (excluding btm folder; only PDFs at SOUL root)
+    if not os.path.isdir(SOUL_DIR):
+        return _empty_payload(status="INCOMPLETE", notes_extra="SOUL_DIR_MISSING", ts=ts)
 
-    # 3) Upload report
-    report_file = _upload_and_wait(client, report_path)
+    # SOUL refresh and report upload are independent network work: run them
+    # concurrently; bureau detection (local) overlaps on this thread.
+    # No `with`: its __exit__ would wait for the report upload (+ PROCESSING poll)
+    # before a SOUL failure could return fail-closed.
+    pool = ThreadPoolExecutor(max_workers=2)
+    try:
+        fut_soul = pool.submit(lambda: _soul_parts(_manifest_manager()))
+        # 3) Upload report
+        fut_report = pool.submit(_upload_report, report_path, content_sha)
+
+        # 2) Detect bureau: PDF text first, filename as fallback
+        # (BTM text is loaded + cached per bureau in _btm_parts)
+        # If bureau unknown, still proceed, but with stricter fail-closed (no BTM)
+        bureau = detect_bureau(report_path, content_sha=content_sha)
+        if bureau == "UNKNOWN":
+            bureau = _detect_bureau_from_filename(report_path)
+
+        try:
+            soul_parts, soul_notes = fut_soul.result()
+        except TimeoutError:
+            return _empty_payload(status="INCOMPLETE", notes_extra="SOUL_UPLOAD_TIMEOUT", ts=ts)
+        except Exception:
+            return _empty_payload(status="INCOMPLETE", notes_extra="SOUL_MANIFEST_FAIL", ts=ts)
+
+        # Safety: if SOUL has no PDFs at root, fail-closed
+        if not soul_parts:
+            notes_extra = "SOUL_NO_PDFS_FOUND" + soul_notes
+            return _empty_payload(status="INCOMPLETE", notes_extra=notes_extra, ts=ts)
+
+        try:
+            report_ref = fut_report.result()
+        except TimeoutError:
+            return _empty_payload(status="INCOMPLETE", notes_extra="REPORT_UPLOAD_TIMEOUT", ts=ts)
+    finally:
+        # early returns don't block on the other task (a running upload finishes
+        # in the background and only warms the report cache)
+        pool.shutdown(wait=False, cancel_futures=True)
 
     # 4) Build content parts (SOUL + BTM + report + instruction)
     parts = _build_parts_with_soul_and_btm(
-        soul_refs=soul_refs,
-        report_uri=report_file.uri,
+        soul_parts=soul_parts,
+        report_uri=report_ref["uri"],
         bureau=bureau,
-        btm_json=btm,
     )
 
     # 5) Model call
     try:
-        resp = client.models.generate_content(
-            model=MODEL_ID,
-            contents=[types.Content(role="user", parts=parts)],
-            config=types.GenerateContentConfig(
-                system_instruction=SYSTEM_INSTRUCTION,
-                temperature=0.0,
-                response_mime_type="application/json",
-            ),
-        )
+        contents = [types.Content(role="user", parts=parts)]
+        def _call():
+            _RATE_LIMITER.acquire()  # each attempt counts against the RPM quota
+            return client.models.generate_content(
+                model=MODEL_ID,
+                contents=contents,
+                config=_generate_config(),
+            )
+
+        resp = _with_retry(_call)
     except Exception as e:
-        return _empty_payload(status="UNKNOWN", notes_extra=f"MODEL_CALL_FAIL:{type(e).__name__}")
+        # a deleted/foreign SOUL uri fails every call: re-validate refs next audit
+        _drop_soul_cache()
+        return _empty_payload(status="UNKNOWN", notes_extra=f"MODEL_CALL_FAIL:{type(e).__name__}", ts=ts)
 
     # 6) Parse + gates
     try:
-        raw = json.loads(resp.text)
+        raw = json_compat.loads(resp.text)
     except Exception:
-        return _empty_payload(status="UNKNOWN", notes_extra="BAD_JSON_OUTPUT")
+        return _empty_payload(status="UNKNOWN", notes_extra="BAD_JSON_OUTPUT", ts=ts)
 
-    raw = _evidence_gate(raw)
-    raw = _validate_payload(raw)
+    raw = _finalize_payload(raw, ts=ts)
 
     # Add bureau context into notes (non-drifting, still technical)
     if raw.get("status") != "INCOMPLETE":
         raw["notes"] = f"{NOTES_IMMUTABLE} | BUREAU={bureau}"
 
+    # Fail-closed transparency: a SOUL standard left out of context must be visible
+    raw["notes"] += soul_notes
+
     return raw
 
 
-def audit_credit_report(file_path: str) -> Dict[str, Any]:
+def audit_credit_report(file_path: str, content_sha: Optional[str] = None) -> Dict[str, Any]:
     """
     Canonical entry point called by Streamlit (main.py)
+    content_sha: optional SHA-256 of the file, if the caller already computed it.
     """
+    ts = _utc_iso()  # one stamp per audit, shared by every payload path
     try:
         if not file_path or not isinstance(file_path, str):
-            return _empty_payload(status="INCOMPLETE", notes_extra="BAD_INPUT")
-
-        if not os.path.exists(file_path):
-            return _empty_payload(status="INCOMPLETE", notes_extra="FILE_NOT_FOUND")
+            return _empty_payload(status="INCOMPLETE", notes_extra="BAD_INPUT", ts=ts)
 
-        if not file_path.lower().endswith(".pdf"):
-            return _empty_payload(status="INCOMPLETE", notes_extra="NOT_PDF")
+        # one stat syscall instead of exists() + later checks
+        try:
+            os.stat(file_path)
+        except OSError:
+            return _empty_payload(status="INCOMPLETE", notes_extra="FILE_NOT_FOUND", ts=ts)
 
-        os.makedirs(TMP_DIR, exist_ok=True)
+        if file_path[-4:].lower() != ".pdf":
+            return _empty_payload(status="INCOMPLETE", notes_extra="NOT_PDF", ts=ts)
 
-        return _run_gemini_audit(file_path)
+        return _run_gemini_audit(file_path, ts, content_sha)
 
     except Exception as e:
-        return _empty_payload(status="UNKNOWN", notes_extra=f"KERNEL_FAIL:{type(e).__name__}")
+        return _empty_payload(status="UNKNOWN", notes_extra=f"KERNEL_FAIL:{type(e).__name__}", ts=ts)
@@ -0,0 +1,160 @@
+"""
+NorthStar Hub — Kernel Core payload helpers (NS-DK-1.0)
+Pure dict/list/str logic (no I/O, no SDK): canon constants, empty payload,
+single-pass finalizer (evidence gate + contract + fail-closed).
+Fully annotated so it can be compiled with mypyc (optional; see README).
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Dict, Final, FrozenSet, List, Pattern, Tuple, TypedDict, Union, cast
+
+# -----------------------------
+# CANON (DO NOT DRIFT)
+# -----------------------------
+KERNEL_VERSION: Final = "NS-DK-1.0"
+NOTES_IMMUTABLE: Final = "TECHNICAL_DATA_CONSISTENCY_CHECK_ONLY"
+
+ALLOWED_STATUS: Final[FrozenSet[str]] = frozenset({"OK", "RISK_DETECTED", "INCOMPLETE", "UNKNOWN", "SCOPE_LIMITATION"})
+ALLOWED_RISK: Final[FrozenSet[str]] = frozenset({"NONE", "LOW", "MEDIUM", "HIGH"})
+
+CONFIDENCE_GATE: Final = 0.70
+
+
+# NS-DK-1.0 finding shape (what survives the evidence gate)
+class Evidence(TypedDict):
+    document: str
+    page: Union[int, str]
+    field: str
+
+
+class Finding(TypedDict, total=False):
+    type: str
+    description: str
+    evidence: Evidence
+
+
+_ISO_CACHE: Tuple[int, str] = (-1, "")
+
+
+def _utc_iso() -> str:
+    """ISO-UTC (second resolution); formatted at most once per wall-clock second."""
+    global _ISO_CACHE
+    now = int(time.time())
+    sec, iso = _ISO_CACHE
+    if sec != now:
+        iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        _ISO_CACHE = (now, iso)
+    return iso
+
+
+_EMPTY_TEMPLATE: Final[Dict[str, Any]] = {
+    "version": KERNEL_VERSION,
+    "timestamp": "",
+    "status": "INCOMPLETE",
+    "risk_level": "NONE",
+    "findings": (),
+    "confidence": 0.0,
+    "notes": NOTES_IMMUTABLE,
+}
+
+
+def _empty_payload(
+    status: str = "INCOMPLETE",
+    risk_level: str = "NONE",
+    confidence: float = 0.0,
+    notes_extra: str = "",
+    ts: str = "",
+) -> Dict[str, Any]:
+    p = _EMPTY_TEMPLATE.copy()  # key order preserved; only the varying fields are set
+    p["timestamp"] = ts or _utc_iso()
+    p["status"] = status
+    p["risk_level"] = risk_level
+    p["findings"] = []
+    p["confidence"] = float(confidence)
+    if notes_extra:
+        p["notes"] = f"{NOTES_IMMUTABLE} | {notes_extra}"
+    return p
+
+
+# Evidence placeholders ("", UNKNOWN, NONE, NULL; any case/whitespace)
+_PLACEHOLDER_RE: Final[Pattern[str]] = re.compile(r"\s*(?:unknown|none|null)?\s*", re.IGNORECASE)
+
+
+def _is_known(v: Any) -> bool:
+    """False for placeholder values (no strip()/upper() copies per check)."""
+    return _PLACEHOLDER_RE.fullmatch(v if isinstance(v, str) else str(v)) is None
+
+
+def _finalize_payload(payload: Dict[str, Any], ts: str = "") -> Dict[str, Any]:
+    """
+    Enforces NS-DK-1.0 contract + evidence gate + fail-closed in a single pass.
+    `ts`: the caller's per-audit stamp (computed once per request); "" => now.
+    - Keep only findings that have evidence: document + page + field.
+    - If status=RISK_DETECTED but no valid findings => UNKNOWN.
+    - Confidence below CONFIDENCE_GATE => UNKNOWN.
+    """
+    try:
+        payload = dict(payload or {})
+        payload["version"] = KERNEL_VERSION
+        payload["timestamp"] = payload.get("timestamp") or ts or _utc_iso()
+
+        status: Any = payload.get("status")
+        if status not in ALLOWED_STATUS:
+            return _empty_payload(status="UNKNOWN", risk_level="NONE", confidence=0.0, notes_extra="BAD_STATUS", ts=ts)
+
+        if payload.get("risk_level") not in ALLOWED_RISK:
+            return _empty_payload(status="UNKNOWN", risk_level="NONE", confidence=0.0, notes_extra="BAD_RISK_LEVEL", ts=ts)
+
+        # Evidence gate (one walk over findings).
+        # Happy path (clean report: OK/INCOMPLETE/SCOPE_LIMITATION + no findings)
+        # skips the walk entirely.
+        findings: Any = payload.get("findings")
+        valid: List[Finding] = []
+        if findings and isinstance(findings, list):
+            append = valid.append
+            for f in findings:
+                if not isinstance(f, dict):
+                    continue
+                ev = f.get("evidence") or {}
+                if not isinstance(ev, dict):
+                    continue
+
+                doc = ev.get("document")
+                page = ev.get("page")
+                field = ev.get("field")
+
+                # avoid placeholders (contract page is an int => no string ops)
+                if doc and page and field and (isinstance(page, int) or _is_known(page)) and _is_known(field):
+                    append(cast(Finding, f))
+
+        payload["findings"] = valid
+
+        raw_conf: Any = payload.get("confidence")
+        conf: float = float(raw_conf) if isinstance(raw_conf, (int, float)) else 0.0
+
+        if status == "RISK_DETECTED" and not valid:
+            payload["status"] = "UNKNOWN"
+            payload["risk_level"] = "NONE"
+            # evidence-gate semantics: float() the raw value (numeric strings count)
+            conf = min(float(raw_conf or 0.0), 0.5)
+
+        payload["confidence"] = conf
+
+        # Integrity gate
+        if conf < CONFIDENCE_GATE:
+            return _empty_payload(
+                status="UNKNOWN",
+                risk_level="NONE",
+                confidence=conf,
+                notes_extra="CONFIDENCE_GATE_ACTIVE",
+                ts=ts,
+            )
+
+        payload["notes"] = NOTES_IMMUTABLE
+        return payload
+
+    except Exception:
+        return _empty_payload(status="UNKNOWN", risk_level="NONE", confidence=0.0, notes_extra="VALIDATION_EXCEPTION", ts=ts)
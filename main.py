@@ -1,10 +1,34 @@
 # main.py
 import os
 import uuid
+import hashlib
 import streamlit as st
 
 from kernel import audit_credit_report, KERNEL_VERSION, NOTES_IMMUTABLE
 
+UPLOAD_COPY_CHUNK = 64 * 1024
+
+
+def _save_uploaded_pdf(uploaded) -> tuple[str, str]:
+    """
+    Stream the upload to tmp/ in 64 KiB chunks, hashing while writing.
+    Returns (temp path, sha256) so the kernel never re-reads the bytes to hash.
+    """
+    os.makedirs("tmp", exist_ok=True)
+
+    # Avoid collisions
+    safe_name = f"{uuid.uuid4().hex}_{uploaded.name}"
+    tmp_path = os.path.join("tmp", safe_name)
+
+    h = hashlib.sha256()
+    uploaded.seek(0)
+    with open(tmp_path, "wb") as f:
+        while chunk := uploaded.read(UPLOAD_COPY_CHUNK):
+            h.update(chunk)
+            f.write(chunk)
+    return tmp_path, h.hexdigest()
+
+
 st.set_page_config(
     page_title="NorthStar Hub | Forensic Audit (Alpha)",
     page_icon="⚖️",
@@ -30,17 +54,10 @@ with col1:
     if uploaded:
         st.success("PDF received. Ready to run audit.")
         if st.button("🚀 Run Forensic Audit", use_container_width=True):
-            os.makedirs("tmp", exist_ok=True)
-
-            # Avoid collisions
-            safe_name = f"{uuid.uuid4().hex}_{uploaded.name}"
-            tmp_path = os.path.join("tmp", safe_name)
-
-            with open(tmp_path, "wb") as f:
-                f.write(uploaded.getbuffer())
+            tmp_path, content_sha = _save_uploaded_pdf(uploaded)
 
             with st.spinner("Running technical consistency audit..."):
-                result = audit_credit_report(tmp_path)
+                result = audit_credit_report(tmp_path, content_sha=content_sha)
 
             # Optional cleanup: remove uploaded file after processing
             try:
@@ -1,8 +1,128 @@
-import json
+import os
 import time
+import random
+import hashlib
 import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple, TypeVar
+
+import json_compat
+
+__all__ = ["ManifestManager", "PdfRefs", "upload_any", "sha256_file"]
+
+T = TypeVar("T")
+
+# PROCESSING poll: exponential backoff + jitter, hard deadline (fail-closed)
+POLL_INITIAL_S = 0.1
+POLL_MAX_S = 2.0
+POLL_FACTOR = 1.7
+UPLOAD_TIMEOUT_S = 60.0
+
+
+# transient Gemini errors (quota / overload): retry with exponential backoff + jitter
+RETRY_STATUS = frozenset({429, 503})
+RETRY_ATTEMPTS = 5
+RETRY_BASE_S = 0.5
+RETRY_CAP_S = 16.0
+
+
+def _status_code(e: BaseException) -> Optional[int]:
+    """google-genai APIError => .code; other HTTP clients => .status_code."""
+    code = getattr(e, "code", None)
+    if code is None:
+        code = getattr(e, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def _with_retry(
+    fn: Callable[[], T],
+    *,
+    max_attempts: int = RETRY_ATTEMPTS,
+    base: float = RETRY_BASE_S,
+    cap: float = RETRY_CAP_S,
+) -> T:
+    """
+    Llama fn(); en 429/503 reintenta con espera min(cap, base*2^i) + jitter.
+    Cualquier otro error (o presupuesto agotado) se propaga tal cual.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt + 1 >= max_attempts or _status_code(e) not in RETRY_STATUS:
+                raise
+            time.sleep(min(cap, base * 2 ** attempt) + random.uniform(0, base))
+    raise RuntimeError("unreachable")
+
+
+class _StillProcessing(TimeoutError):
+    """TimeoutError que conserva el remoto pendiente (se puede seguir consultando)."""
+
+    def __init__(self, msg: str, remote) -> None:
+        super().__init__(msg)
+        self.remote = remote
+
+
+def _wait_active(client, f, timeout_s: float = UPLOAD_TIMEOUT_S):
+    """
+    Espera a que el archivo salga de PROCESSING.
+    Backoff 0.1s -> 2s (x1.7 + jitter): archivos rápidos no pagan 2s fijos.
+    _StillProcessing (TimeoutError) si no termina en `timeout_s`.
+    """
+    deadline = time.monotonic() + timeout_s
+    delay = POLL_INITIAL_S
+    while getattr(getattr(f, "state", None), "name", "") == "PROCESSING":
+        if time.monotonic() > deadline:
+            raise _StillProcessing(f"Upload still PROCESSING after {timeout_s:g}s: {f.name}", f)
+        time.sleep(delay + random.uniform(0, delay * 0.2))
+        delay = min(delay * POLL_FACTOR, POLL_MAX_S)
+        name = f.name
+        f = _with_retry(lambda: client.files.get(name=name))
+    return f
+
+
+# upload dispatch per SDK function: "path" | "file" | "positional", plus "*_handle"
+# once the str form was rejected (TypeError) => later uploads skip the failing call
+_UPLOAD_MODES: Dict[object, str] = {}
+
+
+def _upload_key(fn) -> object:
+    # Keyed by the underlying function (bound methods are new objects per access)
+    return getattr(fn, "__func__", fn)
+
+
+def _upload_mode(fn) -> str:
+    """Resuelve la firma de Files.upload una sola vez."""
+    key = _upload_key(fn)
+    mode = _UPLOAD_MODES.get(key)
+    if mode is None:
+        try:
+            params = frozenset(inspect.signature(fn).parameters)
+        except Exception:
+            params = frozenset()
+        mode = "path" if "path" in params else "file" if "file" in params else "positional"
+        _UPLOAD_MODES[key] = mode
+    return mode
+
+
+UPLOAD_READ_BUFFER = 1024 * 1024
+
+
+def _open_sequential(file_path: str):
+    """
+    Handle para el SDK cuando no acepta path: buffer de 1 MiB (vs 8 KiB) y
+    hint de lectura secuencial al page cache (Linux).
+    """
+    fh = open(file_path, "rb", buffering=UPLOAD_READ_BUFFER)
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return fh
 
 
 def upload_any(client, file_path: str):
@@ -13,114 +133,467 @@ def upload_any(client, file_path: str):
     """
     fn = client.files.upload
 
-    def _wait(f, sleep_s=2):
-        while getattr(getattr(f, "state", None), "name", "") == "PROCESSING":
-            time.sleep(sleep_s)
-            f = client.files.get(name=f.name)
-        return f
-
-    # Introspect signature if possible
-    try:
-        sig = inspect.signature(fn)
-        params = list(sig.parameters.keys())
-    except Exception:
-        params = []
-
-    # Preferred: keyword 'path'
-    if "path" in params:
-        f = fn(path=file_path)
+    def _wait(f):
+        return _wait_active(client, f)
+
+    mode = _upload_mode(fn)
+
+    def _from_handle(call):
+        # reopen per attempt: a retried upload must not see a consumed handle
+        with _open_sequential(file_path) as fh:
+            return call(fh)
+
+    # Preferred: keyword 'path' (SDK streams from disk itself)
+    if mode == "path":
+        f = _with_retry(lambda: fn(path=file_path))
         return _wait(f)
 
-    # Common: keyword 'file'
-    if "file" in params:
-        # try str
+    # Common: keyword 'file' (str first; handle if this SDK rejected str before)
+    if mode == "file":
         try:
-            f = fn(file=file_path)
+            f = _with_retry(lambda: fn(file=file_path))
             return _wait(f)
         except TypeError:
-            pass
-        # try handle
-        with open(file_path, "rb") as fh:
-            f = fn(file=fh)
-            return _wait(f)
+            _UPLOAD_MODES[_upload_key(fn)] = mode = "file_handle"
+    if mode == "file_handle":
+        f = _with_retry(lambda: _from_handle(lambda fh: fn(file=fh)))
+        return _wait(f)
 
     # Fallback: positional
-    try:
-        f = fn(file_path)
-        return _wait(f)
-    except TypeError:
-        with open(file_path, "rb") as fh:
-            f = fn(fh)
+    if mode == "positional":
+        try:
+            f = _with_retry(lambda: fn(file_path))
             return _wait(f)
+        except TypeError:
+            _UPLOAD_MODES[_upload_key(fn)] = "positional_handle"
+    f = _with_retry(lambda: _from_handle(fn))
+    return _wait(f)
+
+
+CONTENT_INDEX_KEY = "_content"
+# Gemini Files API deletes uploads after 48h; stop trusting a ref 1h before that
+REMOTE_TTL_S = 47 * 3600
+UPLOAD_WORKERS = 8
+# SOUL PDFs above this are ignored (decided from the cached scandir stat: no open/parse).
+# Gemini rejects PDFs over 50 MB in generate_content: larger ones would only fail the audit
+MAX_SOUL_BYTES = 50 * 1000 * 1000
+CHECK_WORKERS = 16
+# remote seen ACTIVE less than this ago => trusted without another files.get/list
+LIVENESS_TTL_S = 60.0
+LIVE_MAX = 1024
+# remotes confirmed gone (404 / FAILED): answered locally for DEAD_TTL_S, persisted
+DEAD_KEY = "_dead"
+DEAD_TTL_S = 300
+DEAD_MAX = 256
+# files.list page size (API max is 100) => fewest round trips for the pager
+LIST_PAGE_SIZE = 100
+
+
+class _PdfEntry(NamedTuple):
+    name: str
+    path: str
+    st: os.stat_result
+
+
+class PdfRefs(NamedTuple):
+    """Resultado de ensure_active_pdf_files."""
+
+    refs: List[Dict[str, str]]
+    # local names left out because their upload is still PROCESSING
+    skipped: Tuple[str, ...]
+    # local names not uploaded (size > max_bytes)
+    oversized: Tuple[str, ...]
+    # unix ts of the soonest-expiring ref (0 = none): callers caching refs must not outlive it
+    earliest_expiry: int
+
+
+@lru_cache(maxsize=32)
+def _list_pdf_names(folder_path: str, dir_mtime_ns: int) -> Tuple[str, ...]:
+    """Nombres de PDFs (ordenados) de la carpeta; el mtime del directorio es la clave."""
+    with os.scandir(folder_path) as it:
+        return tuple(sorted(e.name for e in it if e.name.endswith(".pdf") and e.is_file()))
+
+
+def _expires_at(ref: Dict) -> int:
+    """Older manifests only carry uploaded_at => derive the expiry from it."""
+    return ref.get("expires_at") or ref.get("uploaded_at", 0) + REMOTE_TTL_S
+
+
+def sha256_file(file_path: str) -> str:
+    """
+    SHA-256 del archivo completo.
+    hashlib.file_digest (3.11+) hashea en C vía OpenSSL (SHA-NI si existe).
+    """
+    with open(file_path, "rb") as fh:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(fh, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+        return h.hexdigest()
 
 
 class ManifestManager:
     """
     Local manifest:
-      fingerprint -> {name, uri, uploaded_at, local}
+      fingerprint -> {name, uri, uploaded_at, expires_at, local, sha256}
+      "_content"  -> {sha256 -> {name, uri, uploaded_at, expires_at[, state]}}
+                     (state "PROCESSING": upload timed out, polled on next use)
+      "_dead"     -> {remote name -> unix ts}  (404/FAILED, trusted DEAD_TTL_S)
 
     Re-upload when:
-      - local file changed (size/mtime)
+      - local file changed (size/mtime) AND no ACTIVE remote has the same bytes
       - remote missing/not ACTIVE
+      - remote past its 48h Files API lifetime (no liveness RTT spent)
     """
 
-    def __init__(self, manifest_path: str, client):
+    def __init__(
+        self,
+        manifest_path: str,
+        client,
+        max_workers: int = UPLOAD_WORKERS,
+        max_bytes: int = MAX_SOUL_BYTES,
+    ):
         self.path = Path(manifest_path)
         self.client = client
+        # concurrent uploads cap (free-tier quotas => keep it modest)
+        self.max_workers = max(1, int(max_workers))
+        self.max_bytes = int(max_bytes)
+        self._disk_mtime_ns = 0
         self.data: Dict[str, Dict] = self._load()
+        # Shared across audits/reruns (process singleton) => guard data mutations.
+        # Re-entrant: helpers that take it may run under an outer critical section.
+        self._lock = threading.RLock()
+        self._dirty = False
+        # remote name -> monotonic deadline (in memory only: never dirties the manifest)
+        self._live_until: Dict[str, float] = {}
+
+    def _manifest_mtime_ns(self) -> int:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return 0
 
     def _load(self) -> Dict[str, Dict]:
-        if self.path.exists():
+        self._disk_mtime_ns = self._manifest_mtime_ns()
+        if self._disk_mtime_ns:
             try:
-                return json.loads(self.path.read_text(encoding="utf-8"))
+                return json_compat.loads(self.path.read_bytes())
             except Exception:
                 return {}
         return {}
 
+    def refresh(self) -> bool:
+        """
+        Stat, then skip: re-lee el manifest solo si otro proceso lo reescribió
+        (mtime distinto) y no hay cambios locales sin guardar. True si recargó.
+        """
+        with self._lock:
+            if self._dirty or self._manifest_mtime_ns() == self._disk_mtime_ns:
+                return False
+            self.data = self._load()
+            return True
+
     def save(self) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+        """Persist only when data changed; tmp + os.replace => never a torn manifest."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_bytes(json_compat.dumps(self.data))
+            os.replace(tmp, self.path)
+            self._dirty = False
+            self._disk_mtime_ns = self._manifest_mtime_ns()
 
-    def _fingerprint(self, p: Path) -> str:
-        st = p.stat()
-        return f"{p.name}__{st.st_size}__{int(st.st_mtime)}"
+    @staticmethod
+    def _fingerprint_from_stat(name: str, st: os.stat_result) -> str:
+        # "|" can't be confused with "__" inside filenames; mtime_ns => no float truncation
+        return f"{name}|{st.st_size}|{st.st_mtime_ns}"
+
+    def _mark_live(self, remote_name: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            live = self._live_until
+            live[remote_name] = now + LIVENESS_TTL_S
+            if len(live) > LIVE_MAX:
+                # drop expired deadlines; if still over, keep the newest LIVE_MAX
+                keep = {n: t for n, t in live.items() if t > now}
+                if len(keep) > LIVE_MAX:
+                    keep = dict(sorted(keep.items(), key=lambda kv: kv[1])[-LIVE_MAX:])
+                self._live_until = keep
+
+    def _recently_live(self, remote_name: str) -> bool:
+        return self._live_until.get(remote_name, 0.0) > time.monotonic()
+
+    def _recently_dead(self, remote_name: str) -> bool:
+        ts = self.data.get(DEAD_KEY, {}).get(remote_name)
+        return ts is not None and time.time() - ts < DEAD_TTL_S
+
+    def _mark_dead(self, remote_name: str) -> None:
+        now = int(time.time())
+        with self._lock:
+            dead = self.data.setdefault(DEAD_KEY, {})
+            dead[remote_name] = now
+            if len(dead) > DEAD_MAX:
+                # keep the newest DEAD_MAX marks (expired ones go first)
+                keep = sorted(dead.items(), key=lambda kv: kv[1])[-DEAD_MAX:]
+                self.data[DEAD_KEY] = dict(keep)
+            self._dirty = True
 
     def _remote_active(self, remote_name: str) -> bool:
+        if self._recently_live(remote_name):
+            return True
+        if self._recently_dead(remote_name):
+            return False
         try:
-            f = self.client.files.get(name=remote_name)
-            return getattr(getattr(f, "state", None), "name", "") == "ACTIVE"
-        except Exception:
+            f = _with_retry(lambda: self.client.files.get(name=remote_name))
+            state = getattr(getattr(f, "state", None), "name", "")
+        except Exception as e:
+            if _status_code(e) == 404:
+                self._mark_dead(remote_name)
             return False
+        if state == "ACTIVE":
+            self._mark_live(remote_name)
+            return True
+        if state == "FAILED":
+            self._mark_dead(remote_name)
+        return False
+
+    def _active_names(self) -> Set[str]:
+        """Every ACTIVE remote of this API key in one files.list() (paged) call."""
+        return {
+            f.name
+            for f in _with_retry(lambda: list(self.client.files.list(config={"page_size": LIST_PAGE_SIZE})))
+            if getattr(getattr(f, "state", None), "name", "") == "ACTIVE"
+        }
+
+    def _remote_active_many(self, names) -> Dict[str, bool]:
+        """
+        Liveness for many remotes: one files.list() instead of N files.get.
+        If list() fails (SDK/permissions), parallel files.get (~1 RTT).
+        """
+        names = list(dict.fromkeys(names))
+        fresh = {n: True for n in names if self._recently_live(n)}
+        names = [n for n in names if n not in fresh]
+        if not names:
+            return fresh
+        try:
+            active = self._active_names()
+        except Exception:
+            pass
+        else:
+            # only the names asked about: the rest of the project's files would
+            # just fill _live_until
+            for n in names:
+                if n in active:
+                    self._mark_live(n)
+            return {**fresh, **{n: n in active for n in names}}
+        with ThreadPoolExecutor(max_workers=min(CHECK_WORKERS, len(names))) as pool:
+            return {**fresh, **dict(zip(names, pool.map(self._remote_active, names)))}
+
+    def _index_content(self, sha: str, ref: Dict) -> None:
+        now = int(time.time())
+        with self._lock:
+            index = self.data.setdefault(CONTENT_INDEX_KEY, {})
+            # expired remotes are gone server-side: prune them so the index (and
+            # every rewrite of it) stays bounded by ~48h of distinct uploads
+            for k in [k for k, v in index.items() if _expires_at(v) <= now]:
+                del index[k]
+            index[sha] = ref
+            self._dirty = True
+
+    def _poll_pending(self, sha: str, hit: Dict) -> Optional[Dict]:
+        """
+        Remote left in PROCESSING by an earlier call: keep polling it instead of
+        uploading the same bytes again. None => gone/FAILED (caller re-uploads);
+        _StillProcessing => still pending (the index entry stays).
+        """
+        name = hit["name"]
+        try:
+            f = _with_retry(lambda: self.client.files.get(name=name))
+        except Exception as e:
+            if _status_code(e) == 404:
+                self._mark_dead(name)
+            return None
+        f = _wait_active(self.client, f)
+        state = getattr(getattr(f, "state", None), "name", "")
+        if state != "ACTIVE":
+            if state == "FAILED":
+                self._mark_dead(name)
+            return None
+        self._mark_live(name)
+        ref = {
+            "name": name,
+            "uri": f.uri,
+            "uploaded_at": hit["uploaded_at"],
+            "expires_at": _expires_at(hit),
+        }
+        self._index_content(sha, ref)
+        return ref
+
+    def _by_content(self, file_path: str, sha: str) -> Dict[str, str]:
+        """Reuse an ACTIVE remote with identical bytes; otherwise upload and index it."""
+        hit = self.data.get(CONTENT_INDEX_KEY, {}).get(sha)
+        now = int(time.time())
+        # expired refs skip the files.get RTT: the remote is gone (or about to be)
+        if hit and now < _expires_at(hit):
+            if hit.get("state") == "PROCESSING":
+                ref = self._poll_pending(sha, hit)
+                if ref is not None:
+                    return ref
+            elif self._remote_active(hit["name"]):
+                return hit
+
+        try:
+            uploaded = upload_any(self.client, file_path)
+        except _StillProcessing as e:
+            # remember the pending remote: the next call polls it, no second upload
+            self._index_content(
+                sha,
+                {
+                    "name": e.remote.name,
+                    "uri": getattr(e.remote, "uri", None),
+                    "uploaded_at": now,
+                    "expires_at": now + REMOTE_TTL_S,
+                    "state": "PROCESSING",
+                },
+            )
+            raise
+        if getattr(getattr(uploaded, "state", None), "name", "") == "ACTIVE":
+            self._mark_live(uploaded.name)
+        ref = {
+            "name": uploaded.name,
+            "uri": uploaded.uri,
+            "uploaded_at": now,
+            "expires_at": now + REMOTE_TTL_S,
+        }
+        self._index_content(sha, ref)
+        return ref
 
-    def ensure_active_pdf_files(self, folder_path: str) -> List[Dict[str, str]]:
-        folder = Path(folder_path)
-        if not folder.exists():
-            raise FileNotFoundError(f"SOUL folder missing: {folder_path}")
+    def ensure_active_file(self, file_path: str, sha: Optional[str] = None) -> Dict[str, str]:
+        """
+        Single file (e.g. the credit report) deduped by content hash:
+        re-auditing the same bytes reuses the remote instead of re-uploading.
+        """
+        try:
+            ref = self._by_content(file_path, sha or sha256_file(file_path))
+        finally:
+            # a PROCESSING timeout still indexed the pending remote: persist it
+            self.save()
+        return {"name": ref["name"], "uri": ref["uri"], "local": os.path.basename(file_path)}
 
-        refs: List[Dict[str, str]] = []
+    def ensure_active_pdf_files(self, folder_path: str) -> PdfRefs:
+        """
+        Refs ACTIVOS de los PDFs de la carpeta (orden por nombre), junto con los
+        omitidos: los que no salen de PROCESSING a tiempo (skipped; el remoto
+        pendiente queda indexado y se consulta en la próxima llamada) y los que
+        superan max_bytes (oversized, no se suben).
+        TimeoutError solo si ninguno quedó disponible.
+        """
+        skipped: List[str] = []
+        oversized: List[str] = []
+        self.refresh()
+        try:
+            dir_mtime_ns = os.stat(folder_path).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"SOUL folder missing: {folder_path}") from None
 
-        for p in sorted(folder.glob("*.pdf")):
-            if not p.is_file():
+        # Names cached per folder mtime (add/remove/rename bump it); one stat per PDF
+        # still runs every call, so in-place edits change the fingerprint.
+        entries: List[_PdfEntry] = []
+        for name in _list_pdf_names(folder_path, dir_mtime_ns):
+            path = os.path.join(folder_path, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
                 continue
+            if st.st_size <= self.max_bytes:
+                entries.append(_PdfEntry(name, path, st))
+            else:
+                oversized.append(name)
 
-            key = self._fingerprint(p)
-            entry = self.data.get(key)
+        if not entries:
+            self.save()
+            return PdfRefs([], (), tuple(oversized), 0)
+
+        keyed = [(e, self._fingerprint_from_stat(e.name, e.st)) for e in entries]
 
+        # 1) liveness of every cached, unexpired remote, checked in parallel before the main loop
+        now = int(time.time())
+        active = self._remote_active_many(
+            self.data[k]["name"]
+            for _, k in keyed
+            if self.data.get(k, {}).get("name") and now < _expires_at(self.data[k])
+        )
+
+        refs: List[Optional[Dict[str, str]]] = [None] * len(keyed)
+        expiries: List[int] = []
+        misses: List[int] = []
+        for i, (e, key) in enumerate(keyed):
+            entry = self.data.get(key)
             # reuse if remote is ACTIVE
-            if entry and entry.get("name") and self._remote_active(entry["name"]):
-                refs.append({"name": entry["name"], "uri": entry["uri"], "local": p.name})
-                continue
+            if entry and entry.get("name") and active.get(entry["name"]):
+                refs[i] = {"name": entry["name"], "uri": entry["uri"], "local": e.name}
+                expiries.append(_expires_at(entry))
+            else:
+                misses.append(i)
+
+        if misses:
+            # 2) fingerprint miss (touched/renamed/copied): hash, then dedupe by content so
+            # identical PDFs under different names upload once (seen_sha).
+            # I/O-bound (HTTP + PROCESSING polls) => overlap files.
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(misses))) as pool:
+                shas = list(pool.map(sha256_file, (keyed[i][0].path for i in misses)))
+                first: Dict[str, str] = {}
+                for i, sha in zip(misses, shas):
+                    first.setdefault(sha, keyed[i][0].path)
+                futures = {sha: pool.submit(self._by_content, path, sha) for sha, path in first.items()}
+                seen_sha: Dict[str, Dict] = {}
+                for sha, fut in futures.items():
+                    try:
+                        seen_sha[sha] = fut.result()
+                    except TimeoutError:
+                        # stuck in PROCESSING: skip this file, keep the rest of the batch
+                        pass
+
+            if not seen_sha and len(misses) == len(keyed):
+                self.save()
+                raise TimeoutError(f"SOUL uploads still PROCESSING: {len(first)} file(s)")
 
-            # upload/reupload
-            uploaded = upload_any(self.client, str(p))
+            with self._lock:
+                # drop superseded fingerprints of the re-keyed files (old mtime/format)
+                current = {key for _, key in keyed}
+                rekeyed = {keyed[i][0].name for i in misses}
+                for k in [
+                    k
+                    for k, v in self.data.items()
+                    if k not in current and isinstance(v, dict) and v.get("local") in rekeyed
+                ]:
+                    del self.data[k]
 
-            self.data[key] = {
-                "name": uploaded.name,
-                "uri": uploaded.uri,
-                "uploaded_at": int(time.time()),
-                "local": p.name,
-            }
-            refs.append({"name": uploaded.name, "uri": uploaded.uri, "local": p.name})
+                for i, sha in zip(misses, shas):
+                    e, key = keyed[i]
+                    ref = seen_sha.get(sha)
+                    if ref is None:
+                        skipped.append(e.name)
+                        continue
+                    self.data[key] = {
+                        "name": ref["name"],
+                        "uri": ref["uri"],
+                        "uploaded_at": ref["uploaded_at"],
+                        "expires_at": _expires_at(ref),
+                        "local": e.name,
+                        "sha256": sha,
+                    }
+                    refs[i] = {"name": ref["name"], "uri": ref["uri"], "local": e.name}
+                    expiries.append(_expires_at(ref))
+                self._dirty = True
 
         self.save()
-        return refs
+        return PdfRefs(
+            [r for r in refs if r is not None],
+            tuple(skipped),
+            tuple(oversized),
+            min(expiries, default=0),
+        )